@@ -3,9 +3,9 @@ import warnings
 import logging
 import time
 
-# Suppress TensorFlow warnings
+# Suppress TensorFlow warnings (oneDNN stays enabled for its vectorized
+# CPU kernels)
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
-os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'
 warnings.filterwarnings('ignore')
 
 # Suppress torch warnings and errors
@@ -164,6 +164,21 @@ class MongoDBHandler:
             traceback.print_exc()
             return False
     
+    def save_analyses_bulk(self, records: List[Dict]) -> bool:
+        """Save multiple pre-built analysis records in a single round-trip.
+
+        Records must already carry user_id, analysis_type, timestamp and data
+        (the same shape save_analysis builds). Unordered insert is faster and
+        keeps going past individual failures.
+        """
+        try:
+            result = self.analysis_collection.insert_many(records, ordered=False)
+            print(f" Saved {len(result.inserted_ids)} analyses to MongoDB in bulk")
+            return True
+        except Exception as e:
+            print(f"✗ Error bulk-saving analyses: {str(e)}")
+            return False
+
     def get_user_analysis_history(self, user_id: str, limit: int = 50) -> List[Dict]:
         """Get analysis history for a user"""
         try:
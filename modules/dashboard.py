@@ -8,6 +8,46 @@ from database.mongodb_handler import MongoDBHandler
 import base64
 import os
 
+@st.cache_data(show_spinner=False)
+def _build_wellness_df(history_rows):
+    """Build the wellness timeline DataFrame from hashable history rows.
+
+    Cached so unrelated widget interactions don't rebuild the frame on
+    every rerun; the tuple key changes only when the history does.
+    """
+    df = pd.DataFrame.from_records(history_rows, columns=['date', 'wellness', 'type'])
+    df['date'] = pd.to_datetime(df['date'])
+    return df.sort_values('date')
+
+@st.cache_data(show_spinner=False)
+def _history_metrics_df(history_rows):
+    """Columnar view of the history used for vectorized aggregations.
+
+    Keeping these fields in a DataFrame turns the per-item dict walks
+    (average wellness, sentiment counts) into single C-level column ops.
+    """
+    return pd.DataFrame.from_records(
+        history_rows,
+        columns=['timestamp', 'type', 'wellness_score', 'sentiment']
+    )
+
+@st.cache_data(show_spinner=False)
+def _build_history_df(history_rows):
+    """Build the history table DataFrame from hashable rows"""
+    return pd.DataFrame.from_records(
+        history_rows,
+        columns=['Date', 'Type', 'Score', 'Sentiment', 'Risk Level']
+    )
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _history_csv(history_rows):
+    """Serialize the history table to CSV once per distinct history.
+
+    The download button re-renders on every rerun; caching the CSV bytes
+    avoids re-serializing the same rows on unrelated interactions.
+    """
+    return _build_history_df(history_rows).to_csv(index=False).encode('utf-8')
+
 def dashboard_page(db_handler: MongoDBHandler = None):
     # Load and encode the cat frame images (1.png to 6.png)
     assets_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets")
@@ -199,12 +239,20 @@ def dashboard_page(db_handler: MongoDBHandler = None):
     total_analyses = user_stats.get('total_analyses', 0)
     recent_analyses = user_stats.get('recent_analyses', 0)
     
+    # Columnar view of the history; aggregations below become column ops
+    history_df = _history_metrics_df(tuple(
+        (
+            item['timestamp'],
+            item['analysis_type'],
+            item['data'].get('wellness_score'),
+            item['data'].get('sentiment')
+        )
+        for item in user_history
+    ))
+
     # Calculate average wellness score from history (0-100 scale)
-    if user_history:
-        wellness_scores = [item['data'].get('wellness_score', 0) for item in user_history if 'wellness_score' in item.get('data', {})]
-        avg_score = round(np.mean(wellness_scores), 1) if wellness_scores else 0
-    else:
-        avg_score = 0
+    wellness_scores = history_df['wellness_score'].dropna()
+    avg_score = round(float(wellness_scores.mean()), 1) if len(wellness_scores) else 0
     
     with col1:
         display_score = f"{avg_score:.1f}" if avg_score > 0 else "--"
@@ -254,21 +302,11 @@ def dashboard_page(db_handler: MongoDBHandler = None):
         st.markdown("### Emotional Wellness Trends")
         
         if user_history and len(user_history) > 0:
-            # Use real user data
-            df_history = pd.DataFrame(user_history)
-            df_history['timestamp'] = pd.to_datetime(df_history['timestamp'])
-            df_history = df_history.sort_values('timestamp')
-            
-            # Extract wellness scores
-            wellness_data = []
-            for item in user_history:
-                wellness_data.append({
-                    'date': pd.to_datetime(item['timestamp']),
-                    'wellness': item['data'].get('wellness_score', 0),
-                    'type': item['analysis_type']
-                })
-            
-            df_wellness = pd.DataFrame(wellness_data).sort_values('date')
+            # Build the wellness timeline in one cached from_records pass
+            df_wellness = _build_wellness_df(tuple(
+                (item['timestamp'], item['data'].get('wellness_score', 0), item['analysis_type'])
+                for item in user_history
+            ))
             
             # Create line chart with real data
             fig = go.Figure()
@@ -360,10 +398,10 @@ def dashboard_page(db_handler: MongoDBHandler = None):
             
             with col1:
                 # Generate real insights based on user data
-                sentiments = [item['data'].get('sentiment', 'Unknown') for item in user_history if 'sentiment' in item.get('data', {})]
-                positive_count = sentiments.count('Positive')
-                negative_count = sentiments.count('Negative')
-                neutral_count = sentiments.count('Neutral')
+                sentiment_counts = history_df['sentiment'].value_counts()
+                positive_count = int(sentiment_counts.get('Positive', 0))
+                negative_count = int(sentiment_counts.get('Negative', 0))
+                neutral_count = int(sentiment_counts.get('Neutral', 0))
                 
                 st.markdown(f"""
                 <div class="custom-card">
@@ -434,14 +472,19 @@ def dashboard_page(db_handler: MongoDBHandler = None):
         st.markdown("###  Analysis History")
         
         if user_history:
-            # Convert history to DataFrame
-            history_data = pd.DataFrame([{
-                'Date': item['timestamp'],
-                'Type': item['analysis_type'].replace('_', ' ').title(),
-                'Score': item['data'].get('wellness_score', item['data'].get('score', 0)),
-                'Sentiment': item['data'].get('sentiment', item['data'].get('emotion', 'N/A')),
-                'Risk Level': item['data'].get('risk_level', 'Unknown')
-            } for item in user_history])
+            # Convert history to DataFrame (cached on the row tuple so reruns
+            # with unchanged history skip the rebuild)
+            history_rows = tuple(
+                (
+                    item['timestamp'],
+                    item['analysis_type'].replace('_', ' ').title(),
+                    item['data'].get('wellness_score', item['data'].get('score', 0)),
+                    item['data'].get('sentiment', item['data'].get('emotion', 'N/A')),
+                    item['data'].get('risk_level', 'Unknown')
+                )
+                for item in user_history
+            )
+            history_data = _build_history_df(history_rows)
             
             st.dataframe(
                 history_data,
@@ -459,7 +502,7 @@ def dashboard_page(db_handler: MongoDBHandler = None):
             # Export option
             st.download_button(
                 label=" Download History (CSV)",
-                data=history_data.to_csv(index=False).encode('utf-8'),
+                data=_history_csv(history_rows),
                 file_name=f'mental_health_history_{datetime.now().strftime("%Y%m%d")}.csv',
                 mime='text/csv'
             )
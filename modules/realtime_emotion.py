@@ -1,9 +1,8 @@
 import os
 import warnings
 
-# Suppress warnings
+# Suppress warnings (oneDNN stays enabled for its vectorized CPU kernels)
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
-os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'
 warnings.filterwarnings('ignore')
 
 import streamlit as st
@@ -52,6 +51,27 @@ def load_emotion_detection_model():
         st.error(f"Error loading model: {str(e)}")
         return None, None
 
+# Class-index and emoji mappings, hoisted so page reruns don't rebuild them
+EMOTION_DICT = {
+    0: "Angry",
+    1: "Disgusted",
+    2: "Fearful",
+    3: "Happy",
+    4: "Neutral",
+    5: "Sad",
+    6: "Surprised"
+}
+
+EMOTION_EMOJI = {
+    'Angry': '😠',
+    'Disgusted': '🤢',
+    'Fearful': '😨',
+    'Happy': '😊',
+    'Neutral': '😐',
+    'Sad': '😢',
+    'Surprised': '😲'
+}
+
 def calculate_wellness_score(emotion_counts, total_frames):
     """Calculate wellness score based on detected emotions (0-10 scale)"""
     if total_frames == 0:
@@ -120,27 +140,9 @@ def realtime_emotion_page(db_handler: MongoDBHandler = None):
         """)
         return
     
-    # Emotion dictionary
-    emotion_dict = {
-        0: "Angry", 
-        1: "Disgusted", 
-        2: "Fearful", 
-        3: "Happy", 
-        4: "Neutral", 
-        5: "Sad", 
-        6: "Surprised"
-    }
-    
-    emotion_emoji = {
-        'Angry': '😠',
-        'Disgusted': '🤢',
-        'Fearful': '😨',
-        'Happy': '😊',
-        'Neutral': '😐',
-        'Sad': '😢',
-        'Surprised': '😲'
-    }
-    
+    emotion_dict = EMOTION_DICT
+    emotion_emoji = EMOTION_EMOJI
+
     # Instructions
     col1, col2 = st.columns([2, 1])
     
@@ -329,21 +331,31 @@ def display_analysis_results(emotion_log, emotion_counts, emotion_emoji, db_hand
     st.markdown("##  Session Analysis Results")
     
     total_frames = len(emotion_log)
-    
+
     if total_frames == 0:
         st.warning("No emotions detected in this session.")
         return
-    
+
+    # Build the session log DataFrame once; counts and averages come from
+    # single C-level passes over its columns instead of Python loops, and the
+    # same frame is reused for the timeline charts and CSV export below.
+    df = pd.DataFrame(emotion_log)
+    emotion_counts = (
+        df['emotion'].value_counts()
+        .reindex(list(emotion_counts.keys()), fill_value=0)
+        .to_dict()
+    )
+
     # Calculate scores
     wellness_score = calculate_wellness_score(emotion_counts, total_frames)
     risk_score = calculate_risk_score(emotion_counts, total_frames)
-    
+
     # Get dominant emotion
     dominant_emotion = max(emotion_counts, key=emotion_counts.get)
     dominant_percentage = (emotion_counts[dominant_emotion] / total_frames) * 100
-    
+
     # Calculate average confidence
-    avg_confidence = np.mean([log['confidence'] for log in emotion_log])
+    avg_confidence = df['confidence'].mean()
     
     # Session duration
     if len(emotion_log) > 1:
@@ -443,10 +455,7 @@ def display_analysis_results(emotion_log, emotion_counts, emotion_emoji, db_hand
     
     with tab2:
         st.markdown("### Emotion Timeline")
-        
-        # Create timeline dataframe
-        df = pd.DataFrame(emotion_log)
-        
+
         if len(df) > 0:
             # Create timeline plot
             fig = go.Figure()
@@ -587,9 +596,9 @@ def display_analysis_results(emotion_log, emotion_counts, emotion_emoji, db_hand
     st.markdown("---")
     st.markdown("###  Export Session Data")
     
-    # Create CSV
-    df = pd.DataFrame(emotion_log)
-    csv = df.to_csv(index=False)
+    # Create CSV from the DataFrame built at the top of this function
+    # (only the logged columns, not the derived plotting ones)
+    csv = df[['timestamp', 'emotion', 'confidence']].to_csv(index=False)
     
     st.download_button(
         label=" Download Emotion Log (CSV)",
@@ -1,18 +1,16 @@
 import os
+import threading
 import warnings
 
-# Suppress warnings
+# Suppress warnings (oneDNN stays enabled: it provides the vectorized
+# CPU conv kernels this model runs on)
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
-os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'
 warnings.filterwarnings('ignore')
 
 import streamlit as st
 import numpy as np
 import librosa
-import librosa.display
-import matplotlib.pyplot as plt
 import plotly.graph_objects as go
-from io import BytesIO
 import tensorflow as tf
 from tensorflow.keras.models import model_from_json
 from datetime import datetime
@@ -23,7 +21,7 @@ from database.mongodb_handler import MongoDBHandler
 # Load model, scaler and encoder at module level (cached)
 @st.cache_resource
 def load_emotion_model():
-    """Load the trained CNN model, scaler, and encoder"""
+    """Load the trained CNN model, scaling parameters, and class names"""
     try:
         # Build model architecture (since JSON loading has compatibility issues with Keras 3)
         from tensorflow.keras.models import Sequential
@@ -61,21 +59,116 @@ def load_emotion_model():
         
         # Load model weights
         model.load_weights('Models/best_model1_weights.h5')
+        # Inference-only: freezing keeps BatchNormalization in inference
+        # mode and lets the graph optimizer fuse it with the convolutions
+        model.trainable = False
         model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
-        
-        # Load scaler
-        with open('Models/scaler2.pickle', 'rb') as f:
-            scaler = pickle.load(f)
-        
-        # Load encoder
-        with open('Models/encoder2.pickle', 'rb') as f:
-            encoder = pickle.load(f)
-        
-        return model, scaler, encoder
+
+        # Warm up with a dummy forward pass so the graph trace happens at
+        # (cached) load time instead of on the first user request
+        try:
+            model(np.zeros((1, 2376, 1), dtype=np.float32), training=False)
+        except Exception:
+            pass
+        
+        # Scaling/encoding parameters: prefer the compact npz dump (avoids
+        # unpickling full sklearn objects on cold start); fall back to the
+        # shipped pickles and write the npz for next time
+        if os.path.exists(_SCALER_PARAMS_PATH):
+            params = np.load(_SCALER_PARAMS_PATH)
+            mean, scale = params['mean'], params['scale']
+            class_names = params['classes']
+        else:
+            with open('Models/scaler2.pickle', 'rb') as f:
+                scaler = pickle.load(f)
+            with open('Models/encoder2.pickle', 'rb') as f:
+                encoder = pickle.load(f)
+            mean = scaler.mean_.astype(np.float32)
+            scale = scaler.scale_.astype(np.float32)
+            class_names = np.array([str(c) for c in encoder.categories_[0]])
+            try:
+                np.savez(_SCALER_PARAMS_PATH, mean=mean, scale=scale, classes=class_names)
+            except Exception:
+                pass
+
+        # Capitalize once at load; everything downstream uses these directly
+        return model, (mean, scale), tuple(str(c).capitalize() for c in class_names)
     except Exception as e:
         st.error(f"Error loading model: {str(e)}")
         return None, None, None
 
+_TFLITE_PATH = 'Models/best_model1.tflite'
+_SCALER_PARAMS_PATH = 'Models/scaler_params.npz'
+
+# The cached interpreter is shared across sessions but is not thread-safe;
+# set_tensor/invoke/get_tensor must run as one critical section
+_TFLITE_LOCK = threading.Lock()
+
+@st.cache_resource
+def _load_tflite_interpreter(_model):
+    """Convert the CNN to a quantized TFLite interpreter (cached).
+
+    The converted artifact is written next to the Keras weights and reused
+    on later cold starts. Returns (interpreter, input_index, output_index),
+    or None if conversion/loading fails — callers fall back to model.predict.
+    """
+    try:
+        if not os.path.exists(_TFLITE_PATH):
+            converter = tf.lite.TFLiteConverter.from_keras_model(_model)
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+            tflite_model = converter.convert()
+            with open(_TFLITE_PATH, 'wb') as f:
+                f.write(tflite_model)
+        interpreter = tf.lite.Interpreter(model_path=_TFLITE_PATH)
+        interpreter.allocate_tensors()
+        input_index = interpreter.get_input_details()[0]['index']
+        output_index = interpreter.get_output_details()[0]['index']
+        # Warm-up invoke: delegate weight-packing happens here, not on the
+        # first real request
+        interpreter.set_tensor(input_index, np.zeros((1, 2376, 1), dtype=np.float32))
+        interpreter.invoke()
+        return interpreter, input_index, output_index
+    except Exception as e:
+        print(f"TFLite conversion unavailable, using Keras predict: {str(e)}")
+        return None
+
+@st.cache_resource
+def _traced_forward(_model):
+    """Trace the Keras forward pass as a static-shape tf.function (cached).
+
+    Calling the traced concrete function skips model.predict's per-call
+    orchestration (data adapters, callbacks) for the batch-1 hot path.
+    Returns None if tracing fails; callers fall back to predict.
+    """
+    try:
+        infer = tf.function(
+            lambda x: _model(x, training=False),
+            input_signature=[tf.TensorSpec([1, 2376, 1], tf.float32)]
+        )
+        infer(tf.zeros((1, 2376, 1), dtype=tf.float32))  # build the concrete function now
+        return infer
+    except Exception:
+        return None
+
+def _predict_probs(model, features):
+    """Run a single forward pass, preferring the TFLite interpreter"""
+    # The feature pipeline is float32 throughout; this is a no-copy check
+    # that keeps TF from silently casting inside the forward pass
+    features = np.ascontiguousarray(features, dtype=np.float32)
+    tflite = _load_tflite_interpreter(model)
+    if tflite is not None:
+        interpreter, input_index, output_index = tflite
+        # Concurrent sessions share this interpreter; without the lock two
+        # interleaved invokes could hand users each other's predictions
+        with _TFLITE_LOCK:
+            interpreter.set_tensor(input_index, features)
+            interpreter.invoke()
+            return interpreter.get_tensor(output_index)
+    infer = _traced_forward(model)
+    if infer is not None:
+        return infer(tf.constant(features)).numpy()
+    return model.predict(features, verbose=0)
+
 # Audio feature extraction functions (from the notebook)
 def zcr(data, frame_length=2048, hop_length=512):
     """Extract Zero Crossing Rate"""
@@ -92,130 +185,145 @@ def mfcc(data, sr, frame_length=2048, hop_length=512, flatten: bool = True):
     mfcc_feat = librosa.feature.mfcc(y=data, sr=sr, n_mfcc=20)
     return np.squeeze(mfcc_feat.T) if not flatten else np.ravel(mfcc_feat.T)
 
+# Fixed model input size: zcr + rmse + flattened 20-coeff MFCC frames
+_FEATURE_LENGTH = 2376
+
 def extract_features(data, sr=22050, frame_length=2048, hop_length=512):
-    """Extract all audio features for model input"""
-    result = np.array([])
-    
-    result = np.hstack((result,
-                        zcr(data, frame_length, hop_length),
-                        rmse(data, frame_length, hop_length),
-                        mfcc(data, sr, frame_length, hop_length)
-                       ))
+    """Extract all audio features for model input.
+
+    Writes each feature block into one preallocated fixed-size buffer
+    instead of hstack-ing temporaries, so the result is always exactly
+    _FEATURE_LENGTH long (short audio leaves trailing zeros, long audio
+    is truncated) and no pad/truncate pass is needed afterwards.
+    """
+    result = np.zeros(_FEATURE_LENGTH, dtype=np.float32)
+    offset = 0
+    for block in (zcr(data, frame_length, hop_length),
+                  rmse(data, frame_length, hop_length),
+                  mfcc(data, sr, frame_length, hop_length)):
+        block = np.ravel(block)
+        n = min(block.shape[0], _FEATURE_LENGTH - offset)
+        result[offset:offset + n] = block[:n]
+        offset += n
     return result
 
-def get_predict_feat(audio_data, sr, scaler):
+def get_predict_feat(audio_data, sr, scaler_params):
     """Get features for prediction from audio data"""
     try:
-        # Extract features from the audio
-        res = extract_features(audio_data, sr)
-        result = np.array(res)
-        
-        # Check if we have the right number of features
-        if result.shape[0] != 2376:
-            # Pad or truncate to 2376
-            if result.shape[0] < 2376:
-                # Pad with zeros
-                result = np.pad(result, (0, 2376 - result.shape[0]), mode='constant')
-            else:
-                # Truncate
-                result = result[:2376]
-        
-        result = np.reshape(result, newshape=(1, 2376))
-        
-        # Scale the features
-        i_result = scaler.transform(result)
-        
+        # Extract features (already padded/truncated to size); reshape is
+        # a view on the contiguous buffer, and the in-place scaling below
+        # only touches that per-call buffer, so no defensive copy needed
+        result = extract_features(audio_data, sr).reshape(1, _FEATURE_LENGTH)
+
+        # Scale the features in place: (x - mean) / scale
+        mean, scale = scaler_params
+        np.subtract(result, mean, out=result)
+        np.divide(result, scale, out=result)
+
         # Expand dimensions for CNN input
-        final_result = np.expand_dims(i_result, axis=2)
-        
+        final_result = np.expand_dims(result, axis=2)
+
         return final_result
     except Exception as e:
         raise Exception(f"Feature extraction error: {str(e)}")
 
-def predict_emotion(audio_data, sr, model, scaler, encoder):
+def get_predict_feats(clips, sr, scaler_params):
+    """Stack features for several audio clips into one scaled (N, 2376, 1) batch.
+
+    A single in-place scaling pass over the stacked matrix and one model
+    call amortize the per-request overhead when several recordings are
+    pending.
+    """
+    try:
+        mean, scale = scaler_params
+        stacked = np.stack([extract_features(clip, sr) for clip in clips])
+        np.subtract(stacked, mean, out=stacked)
+        np.divide(stacked, scale, out=stacked)
+        return np.expand_dims(stacked, axis=2)
+    except Exception as e:
+        raise Exception(f"Feature extraction error: {str(e)}")
+
+def predict_emotions_batch(clips, sr, model, scaler_params, class_names):
+    """Predict emotions for several clips with one batched forward pass.
+
+    Returns a list of (dominant_emotion, emotion_scores) tuples in input
+    order. Single clips take the regular predict_emotion path (which can
+    use the fixed-shape TFLite interpreter).
+    """
+    if len(clips) == 1:
+        return [predict_emotion(clips[0], sr, model, scaler_params, class_names)]
+    try:
+        features = get_predict_feats(clips, sr, scaler_params)
+        predictions = model.predict(features, batch_size=len(clips), verbose=0)
+
+        results = []
+        for row in predictions:
+            probs = row * 100.0
+            idx = int(probs.argmax())
+            results.append((class_names[idx], dict(zip(class_names, probs.tolist()))))
+        return results
+    except Exception as e:
+        st.error(f"Prediction error: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return [("Unknown", {}) for _ in clips]
+
+def predict_emotion(audio_data, sr, model, scaler_params, class_names):
     """Predict emotion from audio using the trained CNN model"""
     try:
         # Get features
-        features = get_predict_feat(audio_data, sr, scaler)
-        
-        # Make prediction
-        predictions = model.predict(features, verbose=0)
-        
-        # Get emotion classes
-        try:
-            emotion_classes = encoder.categories_[0]
-        except:
-            # Fallback if categories_ doesn't work
-            emotion_classes = ['angry', 'disgust', 'fear', 'happy', 'neutral', 'sad', 'surprise']
-        
-        # Get predicted emotion (highest probability)
-        predicted_idx = np.argmax(predictions[0])
-        predicted_emotion = emotion_classes[predicted_idx]
-        
-        # Convert to string if it's a numpy scalar
-        if hasattr(predicted_emotion, 'item'):
-            predicted_emotion = predicted_emotion.item()
-        predicted_emotion = str(predicted_emotion)
-        
-        # Get confidence scores for all emotions
-        emotion_scores = {}
-        for i, emotion in enumerate(emotion_classes):
-            # Ensure emotion is a string
-            emotion_str = str(emotion.item()) if hasattr(emotion, 'item') else str(emotion)
-            emotion_scores[emotion_str.capitalize()] = float(predictions[0][i] * 100)
-        
-        return predicted_emotion.capitalize(), emotion_scores
+        features = get_predict_feat(audio_data, sr, scaler_params)
+
+        # Make prediction (TFLite interpreter when available, Keras otherwise)
+        predictions = _predict_probs(model, features)
+
+        # Class names are already capitalized Python strings, so this is
+        # one argmax plus a zip — no per-element coercion
+        probs = predictions[0] * 100.0
+        idx = int(probs.argmax())
+        return class_names[idx], dict(zip(class_names, probs.tolist()))
     except Exception as e:
         st.error(f"Prediction error: {str(e)}")
         import traceback
         traceback.print_exc()
         return "Unknown", {}
 
-def calculate_wellness_score(emotion_scores, dominant_emotion):
-    """Calculate wellness score based on emotion predictions (0-10 scale)"""
-    # Positive emotions contribute positively
-    positive_emotions = ['happy', 'calm', 'neutral', 'surprise']
-    negative_emotions = ['sad', 'angry', 'fear', 'disgust']
-    
-    positive_score = sum(emotion_scores.get(e.capitalize(), 0) for e in positive_emotions)
-    negative_score = sum(emotion_scores.get(e.capitalize(), 0) for e in negative_emotions)
-    
-    # Calculate wellness on 0-10 scale
-    if (positive_score + negative_score) > 0:
-        wellness = (positive_score / (positive_score + negative_score)) * 10
-    else:
-        wellness = 5.0  # Neutral baseline
-    
-    return round(wellness, 1)
-
-def calculate_risk_score(emotion_scores, dominant_emotion):
-    """Calculate mental health risk score (0-10 scale, more realistic)"""
-    # Risk weights for concerning emotions
-    risk_weights = {
-        'sad': 0.45,      # Sadness is a strong indicator
-        'fear': 0.40,     # Fear/anxiety is concerning
-        'angry': 0.30,    # Anger can indicate distress
-        'disgust': 0.20   # Disgust is less critical
-    }
-    
-    # Calculate weighted risk from negative emotions
-    risk = 0
-    for emotion, weight in risk_weights.items():
-        emotion_score = emotion_scores.get(emotion.capitalize(), 0)
-        # Only consider if emotion is reasonably present (>20%)
-        if emotion_score > 20:
-            risk += (emotion_score / 100) * weight
-    
-    # Bonus risk if multiple negative emotions are present
-    negative_count = sum(1 for e in ['Sad', 'Fear', 'Angry', 'Disgust'] 
-                        if emotion_scores.get(e, 0) > 20)
-    if negative_count >= 2:
-        risk += 0.5  # Add 0.5 if multiple concerns
-    
-    # Scale to 0-10 and cap
-    risk_score = min(10.0, risk * 10)
-    
-    return round(risk_score, 1)
+# Per-emotion scoring weights, keyed lowercase: (positive, negative, risk).
+# Sadness is the strongest risk indicator, then fear/anxiety, anger, disgust.
+_EMO_META = {
+    'happy':    (1, 0, 0.0),
+    'calm':     (1, 0, 0.0),
+    'neutral':  (1, 0, 0.0),
+    'surprise': (1, 0, 0.0),
+    'sad':      (0, 1, 0.45),
+    'angry':    (0, 1, 0.30),
+    'fear':     (0, 1, 0.40),
+    'disgust':  (0, 1, 0.20),
+}
+
+def compute_scores(emotion_scores):
+    """Compute (wellness, risk) on 0-10 scales in one pass over the emotions.
+
+    Wellness is the positive share of total emotion mass (5.0 neutral
+    baseline when nothing registers). Risk weights negative emotions that
+    are reasonably present (>20%) and adds a bonus when two or more
+    concerning emotions show up at once.
+    """
+    positive = negative = risk = 0.0
+    concern_count = 0
+    for emotion, score in emotion_scores.items():
+        pos_w, neg_w, risk_w = _EMO_META.get(emotion.lower(), (0, 0, 0.0))
+        positive += score * pos_w
+        negative += score * neg_w
+        if neg_w and score > 20:
+            risk += (score / 100) * risk_w
+            concern_count += 1
+    if concern_count >= 2:
+        risk += 0.5
+
+    total = positive + negative
+    wellness = (positive / total) * 10 if total > 0 else 5.0
+    return round(wellness, 1), round(min(10.0, risk * 10), 1)
 
 def voice_analysis_page(db_handler: MongoDBHandler = None):
     st.markdown("#  Voice & Speech Analysis")
@@ -350,46 +458,94 @@ def voice_analysis_page(db_handler: MongoDBHandler = None):
             </div>
             """, unsafe_allow_html=True)
 
+def _load_fast(buf, duration=2.5, offset=0.6, target_sr=22050):
+    """Decode an audio segment with soundfile, falling back to librosa.
+
+    Reads only the requested window, as float32, and resamples (fast
+    polyphase) only when the native rate differs — librosa.load always
+    routes through the resampler even for audio already at the target
+    rate. Formats libsndfile can't parse (e.g. some MP3/M4A) fall back
+    to the librosa path.
+    """
+    try:
+        buf.seek(0)
+        with sf.SoundFile(buf) as f:
+            sr_native = f.samplerate
+            f.seek(int(offset * sr_native))
+            y = f.read(int(duration * sr_native), dtype='float32', always_2d=False)
+        if y.ndim > 1:
+            y = y.mean(axis=1, dtype=np.float32)
+        if sr_native != target_sr:
+            y = librosa.resample(y, orig_sr=sr_native, target_sr=target_sr, res_type='polyphase')
+        return y.astype(np.float32, copy=False), target_sr
+    except Exception:
+        buf.seek(0)
+        return librosa.load(buf, duration=duration, offset=offset)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _analyze_cached(audio_bytes):
+    """Decode, extract features and run the model once per distinct clip.
+
+    Keyed on the raw audio bytes, so reruns triggered by unrelated widget
+    interactions (checkboxes, sliders) after an analysis reuse the decoded
+    window and prediction instead of repeating the whole pipeline.
+    """
+    from io import BytesIO
+
+    buf = BytesIO(audio_bytes)
+    # Duration comes from the header alone; only decode the whole file
+    # if the probe fails
+    try:
+        actual_duration = sf.info(buf).duration
+    except Exception:
+        buf.seek(0)
+        y_full, sr_full = librosa.load(buf, sr=None)
+        actual_duration = len(y_full) / sr_full
+
+    # Load audio for analysis (2.5 seconds with 0.6 offset as per notebook)
+    y, sr = _load_fast(buf)
+
+    model, scaler_params, class_names = load_emotion_model()
+    dominant_emotion, emotion_scores = predict_emotion(y, sr, model, scaler_params, class_names)
+    wellness_score, risk_score = compute_scores(emotion_scores)
+
+    return y, sr, actual_duration, dominant_emotion, emotion_scores, wellness_score, risk_score
+
 def analyze_audio(audio_file, duration=10, offset=0, extract_mfcc_flag=True, show_spec=True, db_handler=None):
     """Comprehensive audio analysis using trained CNN model"""
-    
+
     try:
-        # Load the model, scaler, and encoder
-        model, scaler, encoder = load_emotion_model()
-        
-        if model is None or scaler is None or encoder is None:
+        # Load the model, scaling parameters, and class names
+        model, scaler_params, class_names = load_emotion_model()
+
+        if model is None or scaler_params is None or class_names is None:
             st.error(" Failed to load emotion recognition model. Please check model files.")
             return
-        
-        # First, get the actual duration of the original audio
-        audio_bytes = audio_file.read()
-        audio_file.seek(0)  # Reset for next read
-        y_full, sr_full = librosa.load(BytesIO(audio_bytes), sr=None)
-        actual_duration = len(y_full) / sr_full
-        
-        # Now load audio file for analysis (use 2.5 seconds with 0.6 offset as per notebook)
-        audio_file.seek(0)  # Reset again
-        y, sr = librosa.load(BytesIO(audio_bytes), duration=2.5, offset=0.6)
-        
+
+        # Decode + predict is memoized on the clip's bytes
+        (y, sr, actual_duration, dominant_emotion, emotion_scores,
+         wellness_score, risk_score) = _analyze_cached(audio_file.getvalue())
+
         st.markdown("---")
         st.markdown("##  Voice Analysis Results")
-        
+
         # Get user ID from session
         user_id = st.session_state.get('user_id')
         
-        # Use trained model for emotion prediction
-        dominant_emotion, emotion_scores = predict_emotion(y, sr, model, scaler, encoder)
-        
-        # Calculate wellness and risk scores
-        wellness_score = calculate_wellness_score(emotion_scores, dominant_emotion)
-        risk_score = calculate_risk_score(emotion_scores, dominant_emotion)
-        
         # Calculate additional audio features for visualization
-        tempo, beats = librosa.beat.beat_track(y=y, sr=sr)
-        tempo = float(tempo) if hasattr(tempo, 'item') else float(tempo[0]) if isinstance(tempo, np.ndarray) else float(tempo)
-        spectral_centroids = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
-        spectral_rolloff = librosa.feature.spectral_rolloff(y=y, sr=sr)[0]
+        # Only the BPM estimate is displayed, so skip beat_track's dynamic
+        # programming beat-assignment stage and estimate tempo directly
+        onset_env = librosa.onset.onset_strength(y=y, sr=sr, hop_length=512)
+        tempo = float(librosa.feature.tempo(onset_envelope=onset_env, sr=sr, hop_length=512)[0])
+        if np.isnan(tempo):
+            tempo = 0.0
+        # One STFT pass feeds both spectral features; RMS/ZCR frames are
+        # computed once here and reused by every card below
+        S = np.abs(librosa.stft(y, n_fft=2048, hop_length=512))
+        spectral_centroids = librosa.feature.spectral_centroid(S=S, sr=sr)[0]
+        spectral_rolloff = librosa.feature.spectral_rolloff(S=S, sr=sr)[0]
         zero_crossing_rate = librosa.feature.zero_crossing_rate(y)[0]
+        rms_frames = librosa.feature.rms(y=y)[0]
         
         # Display main metrics
         col1, col2, col3, col4 = st.columns(4)
@@ -426,7 +582,7 @@ def analyze_audio(audio_file, duration=10, offset=0, extract_mfcc_flag=True, sho
             """, unsafe_allow_html=True)
         
         with col3:
-            energy = np.mean(librosa.feature.rms(y=y))
+            energy = rms_frames.mean()
             confidence = max(emotion_scores.values())
             st.markdown(f"""
             <div class="custom-card" style="text-align: center; min-height: 180px; display: flex; flex-direction: column; justify-content: center;">
@@ -459,16 +615,22 @@ def analyze_audio(audio_file, duration=10, offset=0, extract_mfcc_flag=True, sho
             col1, col2 = st.columns([2, 1])
             
             with col1:
-                # Emotion scores chart
+                # Emotion scores chart: one pass over the dict, ndarray
+                # values take Plotly's fast serialization path
+                emotion_names = list(emotion_scores.keys())
+                emotion_vals = np.fromiter(emotion_scores.values(), dtype=np.float32,
+                                           count=len(emotion_scores))
+                bar_texts = np.char.add(np.char.mod('%.1f', emotion_vals), '%')
+
                 fig = go.Figure(data=[go.Bar(
-                    x=list(emotion_scores.values()),
-                    y=list(emotion_scores.keys()),
+                    x=emotion_vals,
+                    y=emotion_names,
                     orientation='h',
                     marker=dict(
                         color=['#ff69b4', '#ff85c0', '#ff99cc', '#ffb6c1', '#ffc0cb', '#ffe4e9'],
                         line=dict(color='white', width=2)
                     ),
-                    text=[f'{v:.1f}%' for v in emotion_scores.values()],
+                    text=bar_texts,
                     textposition='auto'
                 )])
                 
@@ -516,7 +678,7 @@ def analyze_audio(audio_file, duration=10, offset=0, extract_mfcc_flag=True, sho
                 </div>
                 """, unsafe_allow_html=True)
                 
-                st.metric("RMS Energy", f"{np.mean(librosa.feature.rms(y=y)):.3f}")
+                st.metric("RMS Energy", f"{rms_frames.mean():.3f}")
                 st.metric("Zero Crossing Rate", f"{np.mean(zero_crossing_rate):.3f}")
             
             with col3:
@@ -575,7 +737,7 @@ def analyze_audio(audio_file, duration=10, offset=0, extract_mfcc_flag=True, sho
                     'risk_score': risk_score,  # Now 0-10 scale
                     'sentiment': 'Positive' if wellness_score > 6 else 'Neutral' if wellness_score > 4 else 'Negative',
                     'audio_duration': f"{actual_duration:.2f}s",
-                    'tempo': float(tempo) if hasattr(tempo, 'item') else float(tempo[0]) if isinstance(tempo, np.ndarray) else float(tempo),
+                    'tempo': tempo,
                     'energy': float(energy)
                 }
                 
@@ -616,23 +778,51 @@ def analyze_audio(audio_file, duration=10, offset=0, extract_mfcc_flag=True, sho
         
 
 def plot_waveform(y, sr):
-    """Plot audio waveform"""
-    fig, ax = plt.subplots(figsize=(12, 3))
-    librosa.display.waveshow(y, sr=sr, ax=ax, color='#ff69b4')
-    ax.set_xlabel('Time (s)')
-    ax.set_ylabel('Amplitude')
-    ax.set_title('Audio Waveform', fontsize=14, fontweight='bold')
-    ax.grid(True, alpha=0.3)
-    plt.tight_layout()
+    """Plot audio waveform (Plotly, downsampled for the browser)"""
+    step = max(1, len(y) // 4000)
+    y_ds = y[::step]
+    t_ds = np.arange(len(y_ds)) * (step / sr)
+
+    fig = go.Figure(go.Scatter(x=t_ds, y=y_ds, line=dict(color='#ff69b4', width=1)))
+    fig.update_layout(
+        title='Audio Waveform',
+        xaxis_title='Time (s)',
+        yaxis_title='Amplitude',
+        height=250,
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
     return fig
 
-def plot_spectrogram(y, sr):
-    """Plot spectrogram"""
-    fig, ax = plt.subplots(figsize=(12, 4))
-    D = librosa.amplitude_to_db(np.abs(librosa.stft(y)), ref=np.max)
-    img = librosa.display.specshow(D, sr=sr, x_axis='time', y_axis='hz', ax=ax, cmap='RdPu')
-    ax.set_title('Spectrogram', fontsize=14, fontweight='bold')
-    plt.colorbar(img, ax=ax, format='%+2.0f dB')
-    plt.tight_layout()
+def plot_spectrogram(S, sr, hop_length=512):
+    """Plot spectrogram from a precomputed STFT magnitude (Plotly)"""
+    D = librosa.amplitude_to_db(S, ref=np.max)
+
+    fig = go.Figure(go.Heatmap(
+        z=D,
+        x=np.arange(D.shape[1]) * hop_length / sr,
+        y=np.linspace(0, sr / 2, D.shape[0]),
+        colorscale='RdPu',
+        zmin=-80,
+        zmax=0,
+        colorbar=dict(title='dB')
+    ))
+    fig.update_layout(
+        title='Spectrogram',
+        xaxis_title='Time (s)',
+        yaxis_title='Frequency (Hz)',
+        height=350,
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
     return fig
 
+# Warm the model cache while the app is still booting, so the first
+# analysis request doesn't pay the cold Keras build + weight load.
+# Guarded: a failed preload (missing model files, bare import outside
+# Streamlit) must never break the module import itself.
+try:
+    load_emotion_model()
+except Exception:
+    pass
+
@@ -2,277 +2,355 @@
 Custom loaders and UI components for Mental Health Detection
 Uses Hydralit Components for professional loading animations
 """
+import contextlib
+
 import streamlit as st
-import time
-from hydralit_components import HyLoader, Loaders
 
-def show_loader(text="Loading...", duration=2, loader_name=None):
+from utils.styling import _minify, inject_all_css
+
+# hydralit_components is only needed once a loader is actually shown, so
+# it is imported lazily on first use and memoized here; importing this
+# module (e.g. for the CSS bodies) stays cheap.
+_hy_cache = None
+
+def _hy_components():
+    """Import hydralit lazily and cache the pieces the loaders use."""
+    global _hy_cache
+    if _hy_cache is None:
+        from hydralit_components import HyLoader, Loaders
+        _hy_cache = (HyLoader, Loaders.standard_loaders[0])
+    return _hy_cache
+
+@contextlib.contextmanager
+def loader(text="Loading...", loader_name=None):
     """
-    Show a Hydralit loader with animation
-    
+    Show a Hydralit loader while the wrapped block runs
+
+    The loader stays up exactly as long as the real work does, so there
+    is no artificial sleep padding the wait.
+
     Args:
         text (str): Loading text to display
-        duration (float): Duration in seconds (for simulation)
         loader_name (str): Type of loader from Loaders enum (default: STANDARD)
     """
+    HyLoader, default_loader = _hy_components()
     if loader_name is None:
-        loader_name = Loaders.standard_loaders[0]  # Standard pulse loader
-    
+        loader_name = default_loader  # Standard pulse loader
+
     with HyLoader(text, loader_name=loader_name):
-        time.sleep(duration)
-    
+        yield
+
+
+def show_loader(text="Loading...", duration=2, loader_name=None):
+    """
+    Show a Hydralit loader with animation
+
+    Kept for backward compatibility; the duration argument is ignored
+    now that the loader is tied to real work via loader(). Prefer:
+
+        with loader("Analyzing..."):
+            result = do_work()
+
+    Args:
+        text (str): Loading text to display
+        duration (float): Unused, retained for the old signature
+        loader_name (str): Type of loader from Loaders enum (default: STANDARD)
+    """
+    with loader(text, loader_name=loader_name):
+        pass
+
     return None
 
 
+# Static success-animation styling and SVG, minified once at import.
+# The per-call payload carries only the message text and the fadeOut
+# delay, passed through the --fade-delay custom property.
+_SUCCESS_CSS = _minify("""
+    <style>
+    .success-container {
+        display: flex;
+        flex-direction: column;
+        align-items: center;
+        justify-content: center;
+        padding: 40px;
+        background: linear-gradient(135deg, #28a745 0%, #20c997 100%);
+        border-radius: 15px;
+        box-shadow: 0 4px 20px rgba(40, 167, 69, 0.3);
+        animation: successIn 0.5s ease-in, fadeOut 0.3s var(--fade-delay, 1.7s) forwards;
+        will-change: transform, opacity;
+    }
+    @keyframes fadeOut {
+        to {
+            opacity: 0;
+            visibility: hidden;
+        }
+    }
+    .success-checkmark {
+        width: 80px;
+        height: 80px;
+        margin-bottom: 20px;
+    }
+    .success-checkmark path {
+        stroke: white;
+        stroke-width: 6;
+        stroke-dasharray: 100;
+        stroke-dashoffset: 100;
+        animation: checkmark 0.5s 0.3s ease-in-out forwards;
+    }
+    @keyframes checkmark {
+        to {
+            stroke-dashoffset: 0;
+        }
+    }
+    /* Distinct name: this entrance scales, and a plain "fadeIn" here
+       would override the shared opacity-only keyframes for the page */
+    @keyframes successIn {
+        from {
+            opacity: 0;
+            transform: scale(0.8);
+        }
+        to {
+            opacity: 1;
+            transform: scale(1);
+        }
+    }
+    .success-text {
+        font-size: 20px;
+        color: white;
+        font-weight: 700;
+        text-align: center;
+    }
+    </style>
+""")
+
+_SUCCESS_SVG = (
+    '<svg class="success-checkmark" xmlns="http://www.w3.org/2000/svg" viewBox="0 0 52 52">'
+    '<circle cx="26" cy="26" r="25" fill="none"/>'
+    '<path fill="none" d="M14.1 27.2l7.1 7.2 16.7-16.8"/>'
+    '</svg>'
+)
+
 def show_success_animation(text="Success!", duration=2):
     """
     Show a success animation
-    
+
     Args:
         text (str): Success message
         duration (float): Duration to display
     """
+    st.markdown(_SUCCESS_CSS, unsafe_allow_html=True)
     success_placeholder = st.empty()
-    
-    success_placeholder.markdown(f"""
-        <style>
-        .success-container {{
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-            justify-content: center;
-            padding: 40px;
-            background: linear-gradient(135deg, #28a745 0%, #20c997 100%);
-            border-radius: 15px;
-            box-shadow: 0 4px 20px rgba(40, 167, 69, 0.3);
-            animation: fadeIn 0.5s ease-in;
-        }}
-        .success-checkmark {{
-            width: 80px;
-            height: 80px;
-            margin-bottom: 20px;
-        }}
-        .success-checkmark path {{
-            stroke: white;
-            stroke-width: 6;
-            stroke-dasharray: 100;
-            stroke-dashoffset: 100;
-            animation: checkmark 0.5s 0.3s ease-in-out forwards;
-        }}
-        @keyframes checkmark {{
-            to {{
-                stroke-dashoffset: 0;
-            }}
-        }}
-        @keyframes fadeIn {{
-            from {{
-                opacity: 0;
-                transform: scale(0.8);
-            }}
-            to {{
-                opacity: 1;
-                transform: scale(1);
-            }}
-        }}
-        .success-text {{
-            font-size: 20px;
-            color: white;
-            font-weight: 700;
-            text-align: center;
-        }}
-        </style>
-        <div class="success-container">
-            <svg class="success-checkmark" xmlns="http://www.w3.org/2000/svg" viewBox="0 0 52 52">
-                <circle cx="26" cy="26" r="25" fill="none"/>
-                <path fill="none" d="M14.1 27.2l7.1 7.2 16.7-16.8"/>
-            </svg>
-            <div class="success-text">✓ {text}</div>
-        </div>
-    """, unsafe_allow_html=True)
-    
-    time.sleep(duration)
-    success_placeholder.empty()
+
+    success_placeholder.markdown(
+        f'<div class="success-container" style="--fade-delay: {max(duration - 0.3, 0.3)}s">'
+        f'{_SUCCESS_SVG}<div class="success-text">✓ {text}</div></div>',
+        unsafe_allow_html=True
+    )
 
 
+# Static progress-bar styling, emitted once per bar; the per-tick payload
+# below carries only the structure and the current width.
+_PROGRESS_CSS = _minify("""
+    <style>
+    .progress-container {
+        padding: 30px;
+        background: white;
+        border-radius: 15px;
+        box-shadow: 0 4px 20px rgba(0,0,0,0.1);
+    }
+    .progress-text {
+        font-size: 16px;
+        color: #000000;
+        margin-bottom: 15px;
+        font-weight: 600;
+    }
+    .progress-bar-bg {
+        position: relative;
+        width: 100%;
+        height: 30px;
+        background: #f0fdf4;
+        border-radius: 15px;
+        overflow: hidden;
+    }
+    /* Full-width fill scaled on the compositor; animating transform skips
+       the layout/paint stages that an animated width would trigger */
+    .progress-bar-fill {
+        height: 100%;
+        width: 100%;
+        background: linear-gradient(90deg, #c4f0ed 0%, #20c997 100%);
+        transform-origin: left center;
+        transform: scaleX(var(--p, 0));
+        transition: transform 0.3s ease;
+        will-change: transform;
+    }
+    /* Label sits outside the scaled element so the text never stretches */
+    .progress-bar-label {
+        position: absolute;
+        inset: 0;
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        color: #000000;
+        font-weight: 700;
+    }
+    @keyframes progressFill {
+        from {
+            transform: scaleX(0);
+        }
+        to {
+            transform: scaleX(1);
+        }
+    }
+    </style>
+""")
+
+# Pre-split structural template; per call only the text and total duration
+# are spliced between the fixed pieces.
+_PBAR_HEAD = '<div class="progress-container"><div class="progress-text">'
+_PBAR_MID = ('</div><div class="progress-bar-bg">'
+             '<div class="progress-bar-fill" style="animation: progressFill ')
+_PBAR_TAIL = 's linear forwards"></div></div></div>'
+
 def show_progress_bar(text="Processing...", steps=10, step_duration=0.2):
     """
     Show an animated progress bar
-    
+
     Args:
         text (str): Progress text
         steps (int): Number of steps
         step_duration (float): Duration per step
     """
+    # One emit: CSS drives the fill from 0 to 100% over the whole span,
+    # so Python returns immediately instead of sleeping per step
+    total = steps * step_duration
+    st.markdown(_PROGRESS_CSS, unsafe_allow_html=True)
     progress_container = st.empty()
-    
-    for i in range(steps + 1):
-        progress = int((i / steps) * 100)
-        
-        progress_container.markdown(f"""
-            <style>
-            .progress-container {{
-                padding: 30px;
-                background: white;
-                border-radius: 15px;
-                box-shadow: 0 4px 20px rgba(0,0,0,0.1);
-            }}
-            .progress-text {{
-                font-size: 16px;
-                color: #000000;
-                margin-bottom: 15px;
-                font-weight: 600;
-            }}
-            .progress-bar-bg {{
-                width: 100%;
-                height: 30px;
-                background: #f0fdf4;
-                border-radius: 15px;
-                overflow: hidden;
-            }}
-            .progress-bar-fill {{
-                height: 100%;
-                background: linear-gradient(90deg, #c4f0ed 0%, #20c997 100%);
-                width: {progress}%;
-                transition: width 0.3s ease;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                color: white;
-                font-weight: 700;
-            }}
-            </style>
-            <div class="progress-container">
-                <div class="progress-text">{text}</div>
-                <div class="progress-bar-bg">
-                    <div class="progress-bar-fill">{progress}%</div>
-                </div>
-            </div>
-        """, unsafe_allow_html=True)
-        
-        time.sleep(step_duration)
-    
+
+    progress_container.markdown(
+        f"{_PBAR_HEAD}{text}{_PBAR_MID}{total}{_PBAR_TAIL}",
+        unsafe_allow_html=True
+    )
+
     return progress_container
 
 
+# Static transition styling, minified once at import; each call only
+# ships the small overlay div. The overlay self-dismisses via the
+# forwards fill on slideOut, so no Python-side sleep is needed.
+_TRANSITION_CSS = _minify("""
+    <style>
+    @keyframes slideOut {
+        from {
+            opacity: 1;
+            transform: translateX(0);
+        }
+        to {
+            opacity: 0;
+            transform: translateX(-100%);
+        }
+    }
+    @keyframes slideIn {
+        from {
+            opacity: 0;
+            transform: translateX(100%);
+        }
+        to {
+            opacity: 1;
+            transform: translateX(0);
+        }
+    }
+    .transition-container {
+        position: fixed;
+        top: 0;
+        left: 0;
+        right: 0;
+        bottom: 0;
+        background: linear-gradient(135deg, #c4f0ed 0%, #f0fdf4 100%);
+        display: flex;
+        flex-direction: column;
+        align-items: center;
+        justify-content: center;
+        z-index: 9999;
+        animation: slideIn 0.3s ease-in, slideOut 0.3s 0.5s ease-out forwards;
+        will-change: transform, opacity;
+    }
+    .transition-text {
+        font-size: 24px;
+        color: #000000;
+        font-weight: 700;
+    }
+    .transition-icon {
+        font-size: 48px;
+        margin-bottom: 20px;
+    }
+    </style>
+""")
+
 def show_page_transition(from_page, to_page):
     """
     Show a smooth page transition animation
-    
+
     Args:
         from_page (str): Current page name
         to_page (str): Target page name
     """
+    st.markdown(_TRANSITION_CSS, unsafe_allow_html=True)
     transition_placeholder = st.empty()
-    
-    transition_placeholder.markdown(f"""
-        <style>
-        @keyframes slideOut {{
-            from {{
-                opacity: 1;
-                transform: translateX(0);
-            }}
-            to {{
-                opacity: 0;
-                transform: translateX(-100%);
-            }}
-        }}
-        @keyframes slideIn {{
-            from {{
-                opacity: 0;
-                transform: translateX(100%);
-            }}
-            to {{
-                opacity: 1;
-                transform: translateX(0);
-            }}
-        }}
-        .transition-container {{
-            position: fixed;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background: linear-gradient(135deg, #c4f0ed 0%, #f0fdf4 100%);
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-            justify-content: center;
-            z-index: 9999;
-            animation: slideIn 0.3s ease-in, slideOut 0.3s 0.5s ease-out;
-        }}
-        .transition-text {{
-            font-size: 24px;
-            color: #000000;
-            font-weight: 700;
-        }}
-        .transition-icon {{
-            font-size: 48px;
-            margin-bottom: 20px;
-        }}
-        </style>
-        <div class="transition-container">
-            <div class="transition-icon">🔄</div>
-            <div class="transition-text">Loading {to_page}...</div>
-        </div>
-    """, unsafe_allow_html=True)
-    
-    time.sleep(0.8)
-    transition_placeholder.empty()
 
+    transition_placeholder.markdown(
+        '<div class="transition-container"><div class="transition-icon">🔄</div>'
+        f'<div class="transition-text">Loading {to_page}...</div></div>',
+        unsafe_allow_html=True
+    )
 
-def add_loading_css():
-    """
-    Add global CSS for loading states with blur effect
-    """
-    st.markdown("""
-        <style>
-        /* Smooth transitions for all elements */
-        * {
-            transition: all 0.3s ease;
-        }
-        
-        /* Fade in animation for new content */
-        .stMarkdown, .stPlotlyChart, .stDataFrame {
-            animation: fadeIn 0.5s ease-in;
+
+# Loading-state stylesheet body (no <style> wrapper; merged with the main
+# stylesheet by utils.styling.inject_all_css), built and minified once
+# at import.
+_LOADER_CSS_BODY = _minify("""
+        /* Smooth transitions, scoped to the interactive elements that
+           actually animate — a universal transition rule would make the
+           browser watch every property of every node in the DOM */
+        .stButton > button,
+        [data-testid="stFileUploader"],
+        .custom-card {
+            transition: transform 0.3s ease, box-shadow 0.3s ease, background-color 0.3s ease;
         }
-        
-        @keyframes fadeIn {
-            from {
-                opacity: 0;
-                transform: translateY(10px);
-            }
-            to {
-                opacity: 1;
-                transform: translateY(0);
-            }
+
+        /* Opt-in one-shot fade for initial-load content. A blanket rule on
+           .stMarkdown/.stPlotlyChart/.stDataFrame would replay after every
+           rerun, since Streamlit remounts those containers each time */
+        .fade-in-once {
+            animation: fadeIn 0.35s ease-out both;
         }
-        
-        /* Loading button styles */
+
+        /* Loading button styles (static gradient fallback; the infinite
+           animations only run for users who haven't asked for reduced
+           motion, so the compositor isn't kept busy forever otherwise) */
         .stButton>button:disabled {
             background: linear-gradient(90deg, #c4f0ed 0%, #20c997 100%);
             background-size: 200% 100%;
-            animation: shimmer 2s infinite;
-        }
-        
-        @keyframes shimmer {
-            0% {
-                background-position: -200% 0;
-            }
-            100% {
-                background-position: 200% 0;
-            }
         }
-        
+
         /* Skeleton loading for cards */
         .loading-skeleton {
             background: linear-gradient(90deg, #f0fdf4 25%, #c4f0ed 50%, #f0fdf4 75%);
             background-size: 200% 100%;
-            animation: loading 1.5s infinite;
             border-radius: 10px;
             height: 100px;
         }
-        
-        @keyframes loading {
+
+        @media (prefers-reduced-motion: no-preference) {
+            .stButton>button:disabled {
+                animation: shimmer 2s infinite;
+            }
+
+            .loading-skeleton {
+                animation: shimmer 1.5s infinite;
+            }
+        }
+
+        @keyframes shimmer {
             0% {
                 background-position: -200% 0;
             }
@@ -286,47 +364,54 @@ def add_loading_css():
             transition: filter 0.3s ease-in-out;
         }
         
-        /* Style Hydralit loader container with backdrop blur */
-        .hyloader {
-            backdrop-filter: blur(8px) brightness(0.95) !important;
-            -webkit-backdrop-filter: blur(8px) brightness(0.95) !important;
-            background: rgba(255, 255, 255, 0.85) !important;
-            position: fixed !important;
-            top: 0 !important;
-            left: 0 !important;
-            right: 0 !important;
-            bottom: 0 !important;
-            z-index: 999999 !important;
-            display: flex !important;
-            align-items: center !important;
-            justify-content: center !important;
-            animation: fadeIn 0.3s ease-in !important;
+        /* Near-opaque scrim instead of backdrop-filter: blurring the
+           whole app behind the overlay re-filters every frame while the
+           loader animates, and the overlay hides the page anyway.
+           html body prefixes outrank hydralit's own class rules without
+           !important, so the cascade stays overridable */
+        html body .hyloader {
+            background: rgba(255, 255, 255, 0.92);
+            position: fixed;
+            top: 0;
+            left: 0;
+            right: 0;
+            bottom: 0;
+            z-index: 999999;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            animation: fadeIn 0.3s ease-in;
         }
         
         /* Center the loader content */
-        .hyloader > div {
-            background: white !important;
-            padding: 40px 60px !important;
-            border-radius: 20px !important;
-            box-shadow: 0 10px 40px rgba(0, 0, 0, 0.15) !important;
-            display: flex !important;
-            flex-direction: column !important;
-            align-items: center !important;
-            gap: 20px !important;
+        html body .hyloader > div {
+            background: white;
+            padding: 40px 60px;
+            border-radius: 20px;
+            box-shadow: 0 10px 40px rgba(0, 0, 0, 0.15);
+            display: flex;
+            flex-direction: column;
+            align-items: center;
+            gap: 20px;
         }
         
         /* Style the loader text */
-        .hyloader h3 {
-            color: #000000 !important;
-            font-weight: 600 !important;
-            margin: 0 !important;
-            font-size: 18px !important;
+        html body .hyloader h3 {
+            color: #000000;
+            font-weight: 600;
+            margin: 0;
+            font-size: 18px;
         }
         
         /* Make loader animations more prominent */
-        .hyloader svg,
-        .hyloader div[class*="loader"] {
-            transform: scale(1.2) !important;
+        html body .hyloader svg,
+        html body .hyloader div[class*="loader"] {
+            transform: scale(1.2);
         }
-        </style>
-    """, unsafe_allow_html=True)
+    """)
+
+def add_loading_css():
+    """
+    Add global CSS for loading states with blur effect
+    """
+    inject_all_css()
@@ -1,8 +1,21 @@
+import re
+
 import streamlit as st
 
-def apply_custom_css():
-    st.markdown("""
-    <style>
+def _minify(css):
+    """Strip comments and collapse whitespace in a CSS payload.
+
+    Run once at import on the module constants, so every injection ships
+    (and the frontend parses) a fraction of the authored bytes.
+    """
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{}:;,])\s*', r'\1', css)
+    return css.strip()
+
+# The stylesheet body (no <style> wrapper, so it can be merged with the
+# loading CSS into a single injection) is built and minified once at import.
+_CUSTOM_CSS_BODY = _minify("""
     /* Import Google Fonts */
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
     
@@ -26,32 +39,44 @@ def apply_custom_css():
         color: #000000;
     }
     
-    /* Sidebar Toggle Button - Make it more visible */
-    button[kind="header"] {
+    /* Sidebar toggle buttons - shared look for every variant Streamlit
+       has used for this control; the union rule keeps one copy of the
+       declarations each variant repeated */
+    :is(button[kind="header"],
+        [data-testid="collapsedControl"],
+        button[data-testid="baseButton-header"],
+        section[data-testid="stSidebarCollapsedControl"] button) {
         background-color: #c4f0ed !important;
         color: #000000 !important;
+        backface-visibility: hidden;
+    }
+
+    :is(button[kind="header"],
+        [data-testid="collapsedControl"],
+        button[data-testid="baseButton-header"],
+        section[data-testid="stSidebarCollapsedControl"] button):hover {
+        background-color: #a8e4e0 !important;
+    }
+
+    button[kind="header"] {
         border-radius: 8px !important;
         padding: 8px !important;
         transition: all 0.3s ease !important;
     }
     
     button[kind="header"]:hover {
-        background-color: #a8e4e0 !important;
-        transform: scale(1.1) !important;
+        transform: translate3d(0, 0, 0) scale3d(1.1, 1.1, 1) !important;
     }
     
     /* Collapsed sidebar button */
     [data-testid="collapsedControl"] {
-        background-color: #c4f0ed !important;
-        color: #000000 !important;
         border-radius: 8px !important;
         padding: 12px !important;
         box-shadow: 0 4px 12px rgba(196, 240, 237, 0.4) !important;
     }
     
     [data-testid="collapsedControl"]:hover {
-        background-color: #a8e4e0 !important;
-        transform: scale(1.15) !important;
+        transform: translate3d(0, 0, 0) scale3d(1.15, 1.15, 1) !important;
         box-shadow: 0 6px 16px rgba(196, 240, 237, 0.5) !important;
     }
     
@@ -86,7 +111,7 @@ def apply_custom_css():
     }
     
     .element-container div.stButton > button:hover {
-        transform: translateY(-2px);
+        transform: translate3d(0, -2px, 0);
         box-shadow: 0 6px 16px rgba(196, 240, 237, 0.4);
         background: #a8e4e0;
     }
@@ -187,6 +212,16 @@ def apply_custom_css():
         border: 2px solid #c4f0ed;
         border-radius: 8px;
     }
+
+    /* Skip rendering work for heavy widgets while they're off-screen;
+       the intrinsic size keeps the scrollbar from jumping as they come
+       into view */
+    .stPlotlyChart,
+    .stDataFrame,
+    .custom-card {
+        content-visibility: auto;
+        contain-intrinsic-size: 400px 300px;
+    }
     
     /* Success/Warning/Error Messages */
     .stSuccess {
@@ -216,10 +251,13 @@ def apply_custom_css():
         margin: 10px 0;
         border: 1px solid #c4f0ed;
         transition: all 0.3s ease;
+        /* Pre-promote to its own layer so the hover lift starts without
+           a paint spike */
+        transform: translateZ(0);
     }
-    
+
     .custom-card:hover {
-        transform: translateY(-5px);
+        transform: translate3d(0, -5px, 0);
         box-shadow: 0 8px 20px rgba(196, 240, 237, 0.25);
     }
     
@@ -248,12 +286,13 @@ def apply_custom_css():
         color: #000000;
     }
     
-    /* Animation */
+    /* Animation - single canonical fadeIn; everything that fades
+       (.fade-in, .fade-in-once, .hyloader) shares this definition */
     @keyframes fadeIn {
-        from { opacity: 0; transform: translateY(10px); }
-        to { opacity: 1; transform: translateY(0); }
+        from { opacity: 0; }
+        to { opacity: 1; }
     }
-    
+
     .fade-in {
         animation: fadeIn 0.5s ease-out;
     }
@@ -284,8 +323,6 @@ def apply_custom_css():
     
     /* Make sidebar toggle SUPER visible */
     button[data-testid="baseButton-header"] {
-        background-color: #c4f0ed !important;
-        color: #000000 !important;
         border-radius: 50% !important;
         width: 40px !important;
         height: 40px !important;
@@ -299,8 +336,7 @@ def apply_custom_css():
     }
     
     button[data-testid="baseButton-header"]:hover {
-        background-color: #a8e4e0 !important;
-        transform: scale(1.2) !important;
+        transform: translate3d(0, 0, 0) scale3d(1.2, 1.2, 1) !important;
         box-shadow: 0 6px 20px rgba(196, 240, 237, 0.8) !important;
     }
     
@@ -313,30 +349,87 @@ def apply_custom_css():
     }
     
     section[data-testid="stSidebarCollapsedControl"] button {
-        background: #c4f0ed !important;
-        color: #000000 !important;
+        position: relative !important;
         border-radius: 12px !important;
         padding: 15px 20px !important;
         font-size: 18px !important;
         font-weight: 700 !important;
         box-shadow: 0 6px 20px rgba(196, 240, 237, 0.6) !important;
         border: 3px solid white !important;
-        animation: pulse 2s infinite !important;
     }
-    
+
+    /* The pulse glow lives on a pseudo-element whose opacity/scale
+       animate on the compositor; animating box-shadow directly would
+       repaint the button and its surroundings every frame */
+    section[data-testid="stSidebarCollapsedControl"] button::after {
+        content: "";
+        position: absolute;
+        inset: 0;
+        border-radius: 12px;
+        box-shadow: 0 6px 30px rgba(196, 240, 237, 0.9);
+        opacity: 0;
+        pointer-events: none;
+        will-change: transform, opacity;
+    }
+
+    /* The attention pulse only runs when the user hasn't asked for
+       reduced motion; the static shadow above is the fallback */
+    @media (prefers-reduced-motion: no-preference) {
+        section[data-testid="stSidebarCollapsedControl"] button::after {
+            animation: pulse 2s infinite;
+        }
+    }
+
     section[data-testid="stSidebarCollapsedControl"] button:hover {
-        background: #a8e4e0 !important;
-        transform: scale(1.15) !important;
+        transform: translate3d(0, 0, 0) scale3d(1.15, 1.15, 1) !important;
         box-shadow: 0 8px 25px rgba(196, 240, 237, 0.8) !important;
     }
     
     @keyframes pulse {
         0%, 100% {
-            box-shadow: 0 6px 20px rgba(196, 240, 237, 0.6);
+            opacity: 0.6;
+            transform: scale(1);
         }
         50% {
-            box-shadow: 0 6px 30px rgba(196, 240, 237, 0.9);
+            opacity: 1;
+            transform: scale(1.02);
         }
     }
-    </style>
-    """, unsafe_allow_html=True)
+    """)
+
+@st.cache_resource(show_spinner=False)
+def _inject_css(key, payload):
+    """Emit a CSS payload through st.markdown once per key.
+
+    Streamlit replays st element calls made inside cached functions, so
+    the payload still reaches the page on every rerun while the Python
+    body only executes on the first call.
+    """
+    st.markdown(payload, unsafe_allow_html=True)
+    return True
+
+@st.cache_resource(show_spinner=False)
+def _merged_payload():
+    """Assemble the combined <style> payload once per process.
+
+    Cached so reruns skip the loaders import and the string concat; the
+    key-less lookup pairs with _inject_css, which caches the emission.
+    """
+    try:
+        from utils.loaders import _LOADER_CSS_BODY
+    except Exception:
+        # loaders (hydralit) unavailable; ship the main stylesheet alone
+        return "custom", f"<style>{_CUSTOM_CSS_BODY}</style>"
+    return "all", f"<style>{_CUSTOM_CSS_BODY}{_LOADER_CSS_BODY}</style>"
+
+def inject_all_css():
+    """Emit the custom and loading stylesheets as one <style> block.
+
+    One markdown payload means one element for the frontend to parse and
+    a single protobuf across the server-browser bridge instead of two.
+    """
+    key, payload = _merged_payload()
+    _inject_css(key, payload)
+
+def apply_custom_css():
+    inject_all_css()